@@ -0,0 +1,96 @@
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict
+
+
+# === Constants ===
+ENTRY_POINTS = {
+    "app.py": "",
+    "check_answer.py": "",
+    "get_time.py": "1 2\n",
+}
+HEAVY_PACKAGES = ["numpy", "pandas", "gurobipy"]
+QUERY_COUNTS = [1, 1_000, 100_000]
+SINGLE_QUERY_RUNS = 20
+N_LOCATIONS = 50
+
+
+def profile_run(script: str, stdin: str = "") -> Dict[str, float]:
+    """
+    Run an entry point end to end under `python -X importtime` and report, in milliseconds,
+    its wall time, its total import time and the cumulative import time of HEAVY_PACKAGES.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", script],
+        input=stdin, capture_output=True, text=True, check=True
+    )
+    report = {"wall": (time.perf_counter() - start) * 1000, "imports": 0.0}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        cumulative_ms = int(fields[1]) / 1000
+        name = fields[2][1:]
+        if not name.startswith(" "):
+            # Top-level imports; nested ones are already included in their cumulative time
+            report["imports"] += cumulative_ms
+        if name.strip() in HEAVY_PACKAGES:
+            report.setdefault(name.strip(), cumulative_ms)
+    return report
+
+
+def run_get_time(queries: str) -> float:
+    """
+    Wall time in seconds of one get_time.py process answering the given queries.
+    """
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "get_time.py"],
+        input=queries, capture_output=True, text=True, check=True
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Main workflow:
+    - Report wall time and import time of real runs of every CLI entry point
+    - Report per-query latency of get_time.py for batched and one-query-per-process use
+    Note: app.py is run for real, so it rewrites output_results/ (with identical content).
+    """
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    rng = random.Random(0)
+
+    # Warm the binary time matrix so no run below pays for compiling it
+    run_get_time("1 1\n")
+
+    print("=== Real runs (python -X importtime <script>, ms) ===")
+    print(f"{'script':<16} {'wall':>8} {'imports':>8} " + " ".join(f"{name:>8}" for name in HEAVY_PACKAGES))
+    for script, stdin in ENTRY_POINTS.items():
+        report = profile_run(script, stdin)
+        print(
+            f"{script:<16} {report['wall']:8.1f} {report['imports']:8.1f} "
+            + " ".join(f"{report[name]:8.1f}" if name in report else f"{'-':>8}" for name in HEAVY_PACKAGES)
+        )
+
+    print("=== get_time.py per-query latency ===")
+    for n_queries in QUERY_COUNTS:
+        queries = "".join(
+            f"{rng.randint(1, N_LOCATIONS)} {rng.randint(1, N_LOCATIONS)}\n" for _ in range(n_queries)
+        )
+        seconds = run_get_time(queries)
+        print(f"batch of {n_queries:>7}: {seconds * 1000:8.1f} ms total, {seconds / n_queries * 1e6:10.2f} us/query")
+
+    seconds = sum(run_get_time("1 2\n") for _ in range(SINGLE_QUERY_RUNS))
+    print(f"one process per query: {seconds / SINGLE_QUERY_RUNS * 1e6:10.2f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,41 @@
-import pandas as pd
+import sys
+import numpy as np
 
-# Load the data
-time_matrix_path = "time_matrix.csv"
-time_matrix = pd.read_csv(time_matrix_path)
+from time_matrix_cache import load_time_array
 
-# Generate sorted list of locations
-locations = sorted(time_matrix['FROM'].unique(), key=lambda x: int(x.replace('LOC', '')))
+# === Constants ===
+TIME_MATRIX_PATH = "time_matrix.csv"
 
-# Create adjacency matrix
-time_matrix = time_matrix.pivot(index='FROM', columns='TO', values='XFER_TIME')
-time_matrix = time_matrix.reindex(index=locations, columns=locations)
 
-# Input indices as integers referring to LOC numbers
-i, j = map(int, input().split())
+def lookup_times(time_array: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Look up transfer times for an (n, 2) array of LOC numbers in one vectorized pass (-1 = unknown).
+    """
+    i, j = queries[:, 0], queries[:, 1]
+    size = time_array.shape[0]
+    valid = (i >= 0) & (i < size) & (j >= 0) & (j < size)
 
-# Convert to label strings
-from_label = f"LOC{i}"
-to_label = f"LOC{j}"
+    values = np.full(len(queries), -1, dtype=time_array.dtype)
+    values[valid] = time_array[i[valid], j[valid]]
+    return values
 
-# Retrieve and print the value
-print(time_matrix.loc[from_label, to_label])
+
+def main():
+    """
+    Answer `i j` queries (one per line, LOC numbers) from a file argument or stdin.
+    Usage: python get_time.py [query_file] < queries
+    """
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            text = f.read()
+    else:
+        text = sys.stdin.read()
+
+    queries = np.array(text.split(), dtype=np.int64).reshape(-1, 2)
+    values = lookup_times(load_time_array(TIME_MATRIX_PATH), queries)
+
+    sys.stdout.write("".join(f"{v}\n" if v >= 0 else "nan\n" for v in values.tolist()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+
+# === Constants ===
+WIP_DATA_FOLDER = "wip_data"
+HOST = "127.0.0.1"
+PORT = 8765
+
+CONCURRENCY = 16
+REQUESTS_PER_CLIENT = 20
+DISTINCT_FRACTION = 0.5   # share of requests with jittered Q-times, i.e. a snapshot not seen before
+
+
+def load_snapshots(folder: str = WIP_DATA_FOLDER):
+    """
+    Read every WIP CSV as a list of records for the /dispatch body.
+    """
+    snapshots = []
+    for wip_data_file in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, wip_data_file), newline="") as f:
+            snapshots.append([
+                {**row, "Remaining Q-Time": int(row["Remaining Q-Time"])}
+                for row in csv.DictReader(f)
+            ])
+    return snapshots
+
+
+async def open_connection(address):
+    if isinstance(address, int):
+        return await asyncio.open_connection(HOST, address)
+    return await asyncio.open_unix_connection(address)
+
+
+async def http_request(reader, writer, method: str, path: str, payload=None):
+    """
+    Send one keep-alive HTTP request and return (status, decoded JSON body).
+    """
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {HOST}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers["content-length"]))
+    return status, json.loads(data)
+
+
+async def client(address, snapshots, n_requests: int, rng: random.Random, latencies: list, statuses: dict):
+    reader, writer = await open_connection(address)
+    try:
+        for _ in range(n_requests):
+            wips = rng.choice(snapshots)
+            if rng.random() < DISTINCT_FRACTION:
+                wips = [{**wip, "Remaining Q-Time": wip["Remaining Q-Time"] + rng.randint(0, 5)} for wip in wips]
+
+            start = time.perf_counter()
+            status, _ = await http_request(reader, writer, "POST", "/dispatch", {"wips": wips})
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(address, concurrency: int = CONCURRENCY, n_requests: int = REQUESTS_PER_CLIENT):
+    """
+    Fire concurrency keep-alive clients at the service and report client and server side latency.
+    """
+    snapshots = load_snapshots()
+    latencies = []
+    statuses = {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(address, snapshots, n_requests, random.Random(seed), latencies, statuses)
+        for seed in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.2f} s ({len(latencies) / elapsed:.1f} req/s), statuses {statuses}")
+    for p in (50, 90, 95, 99):
+        print(f"client p{p}: {1000 * latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]:.1f} ms")
+
+    reader, writer = await open_connection(address)
+    _, metrics = await http_request(reader, writer, "GET", "/metrics")
+    writer.close()
+    print("server metrics:", json.dumps(metrics, indent=2))
+
+
+def main():
+    """
+    Usage: python load_test.py [port | unix_socket_path] [concurrency] [requests_per_client]
+    """
+    arg = sys.argv[1] if len(sys.argv) > 1 else str(PORT)
+    address = int(arg) if arg.isdigit() else arg
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else CONCURRENCY
+    n_requests = int(sys.argv[3]) if len(sys.argv) > 3 else REQUESTS_PER_CLIENT
+    asyncio.run(run(address, concurrency, n_requests))
+
+
+if __name__ == "__main__":
+    main()
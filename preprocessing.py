@@ -1,7 +1,84 @@
+import functools
 from itertools import permutations, combinations
 from wip_utils import time_it
 
 
+def _evaluate_pair_paths(from_1, to_1, from_2, to_2, travel):
+    """
+    Evaluate every feasible pickup-delivery order for one pair of WIPs given only their locations.
+
+    Args:
+        from_1, to_1 (str): pickup and drop-off location of the first WIP.
+        from_2, to_2 (str): pickup and drop-off location of the second WIP.
+        travel (callable): travel(loc_from, loc_to) -> transfer time.
+
+    Returns:
+        list: [(order, arrival_order, arrival_times), ...] where order and arrival_order
+            hold indices 0/1 into the pair.
+    """
+    paths = []
+
+    # Build the 4 pickup/drop-off location points
+    locs = [
+        (0, 'from', from_1),
+        (0, 'to', to_1),
+        (1, 'from', from_2),
+        (1, 'to', to_2)
+    ]
+
+    # Generate all permutations of the 4 points
+    for perm in permutations(locs):
+        # Ensure 'from' precedes 'to' for each WIP
+        seen_pickup = set()
+        valid_order = True
+
+        for wip_idx, typ, _ in perm:
+            if typ == 'from':
+                seen_pickup.add(wip_idx)
+            elif typ == 'to' and wip_idx not in seen_pickup:
+                valid_order = False
+                break
+
+        if not valid_order:
+            continue
+
+        # Calculate cumulative travel times along the permutation
+        cum_times = [0]
+        total_cost = 0
+
+        for i in range(len(perm) - 1):
+            travel_time = travel(perm[i][2], perm[i + 1][2])
+            total_cost += travel_time
+            cum_times.append(total_cost)
+
+        # Extract arrival times at each WIP's drop-off location
+        arrival_times = {
+            wip_idx: cum_times[idx]
+            for idx, (wip_idx, typ, _) in enumerate(perm)
+            if typ == 'to'
+        }
+
+        # Determine arrival order
+        sorted_arrivals = sorted(arrival_times.items(), key=lambda x: x[1])
+        arrival_order = tuple(wip_idx for wip_idx, _ in sorted_arrivals)
+        arrival_time_values = tuple(time for _, time in sorted_arrivals)
+
+        order = tuple(wip_idx for wip_idx, _, _ in perm)
+        paths.append((order, arrival_order, arrival_time_values))
+
+    return paths
+
+
+def _pair_result(wip_pair, paths):
+    """
+    Map index-based pair paths back to {path_key: ((first_arrive_wip, second_arrive_wip), times)}.
+    """
+    return {
+        tuple(wip_pair[k] for k in order): (tuple(wip_pair[k] for k in arrival_order), arrival_times)
+        for order, arrival_order, arrival_times in paths
+    }
+
+
 @time_it
 def generate_combinations(wip_ids, wip_from, wip_to, time_matrix, cart_capacity=2):
     """
@@ -26,62 +103,69 @@ def generate_combinations(wip_ids, wip_from, wip_to, time_matrix, cart_capacity=
     """
     result_dict = {}
 
+    def travel(loc_from, loc_to):
+        return time_matrix.loc[loc_from, loc_to]
+
     # Generate all unique WIP pairs
     for wip_pair in combinations(wip_ids, cart_capacity):
         wip_1, wip_2 = wip_pair
-        path_dict = {}
-
-        # Build the 4 pickup/drop-off location points
-        locs = [
-            (wip_1, 'from', wip_from[wip_1]),
-            (wip_1, 'to', wip_to[wip_1]),
-            (wip_2, 'from', wip_from[wip_2]),
-            (wip_2, 'to', wip_to[wip_2])
-        ]
-
-        # Generate all permutations of the 4 points
-        for perm in permutations(locs):
-            # Ensure 'from' precedes 'to' for each WIP
-            seen_pickup = set()
-            valid_order = True
-
-            for wip_id, typ, _ in perm:
-                if typ == 'from':
-                    seen_pickup.add(wip_id)
-                elif typ == 'to' and wip_id not in seen_pickup:
-                    valid_order = False
-                    break
-
-            if not valid_order:
-                continue
-
-            # Calculate cumulative travel times along the permutation
-            cum_times = [0]
-            total_cost = 0
-
-            for i in range(len(perm) - 1):
-                loc_from = perm[i][2]
-                loc_to = perm[i + 1][2]
-                travel_time = time_matrix.loc[loc_from, loc_to]
-                total_cost += travel_time
-                cum_times.append(total_cost)
-
-            # Extract arrival times at each WIP's drop-off location
-            arrival_times = {
-                wip_id: cum_times[idx]
-                for idx, (wip_id, typ, _) in enumerate(perm)
-                if typ == 'to'
-            }
+        paths = _evaluate_pair_paths(wip_from[wip_1], wip_to[wip_1], wip_from[wip_2], wip_to[wip_2], travel)
+        result_dict[wip_pair] = _pair_result(wip_pair, paths)
 
-            # Determine arrival order
-            sorted_arrivals = sorted(arrival_times.items(), key=lambda x: x[1])
-            arrival_wips = tuple(wip for wip, _ in sorted_arrivals)
-            arrival_time_values = tuple(time for _, time in sorted_arrivals)
+    return result_dict
 
-            # Store this feasible path and arrival info
-            path_key = tuple(wip_id for wip_id, _, _ in perm)
-            path_dict[path_key] = (arrival_wips, arrival_time_values)
 
-        result_dict[wip_pair] = path_dict
+def make_pair_path_cache(time_dict, maxsize=200_000):
+    """
+    Build a cached pair path evaluator keyed only by the four locations of a WIP pair.
+
+    Args:
+        time_dict (dict): {from_loc: {to_loc: transfer time}}.
+        maxsize (int): maximum number of cached location quadruples.
+
+    Returns:
+        callable: pair_paths(from_1, to_1, from_2, to_2) -> list as returned by _evaluate_pair_paths.
+    """
+    def travel(loc_from, loc_to):
+        return time_dict[loc_from][loc_to]
 
+    @functools.lru_cache(maxsize=maxsize)
+    def pair_paths(from_1, to_1, from_2, to_2):
+        return _evaluate_pair_paths(from_1, to_1, from_2, to_2, travel)
+
+    return pair_paths
+
+
+def generate_combinations_cached(wip_ids, wip_from, wip_to, pair_paths, cart_capacity=2):
+    """
+    Same result as generate_combinations, reusing pair paths cached by make_pair_path_cache.
+    """
+    result_dict = {}
+    for wip_pair in combinations(wip_ids, cart_capacity):
+        wip_1, wip_2 = wip_pair
+        paths = pair_paths(wip_from[wip_1], wip_to[wip_1], wip_from[wip_2], wip_to[wip_2])
+        result_dict[wip_pair] = _pair_result(wip_pair, paths)
     return result_dict
+
+
+def expand_path(path, wip_from, wip_to):
+    """
+    Expand a path key into its pickup/delivery stops.
+
+    Args:
+        path (tuple): WIP IDs in visiting order; first occurrence is the pickup, second the delivery.
+        wip_from (dict): Mapping {wip_id: from_location}.
+        wip_to (dict): Mapping {wip_id: to_location}.
+
+    Returns:
+        list: [(wip_id, action, location), ...] with action "PICKUP" or "DELIVERY".
+    """
+    seen = set()
+    stops = []
+    for wip in path:
+        if wip in seen:
+            stops.append((wip, "DELIVERY", wip_to[wip]))
+        else:
+            seen.add(wip)
+            stops.append((wip, "PICKUP", wip_from[wip]))
+    return stops
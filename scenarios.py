@@ -0,0 +1,372 @@
+import os
+import time
+import pandas as pd
+from gurobipy import GRB
+from typing import Any, Dict, List, Tuple
+
+from preprocessing import generate_combinations, expand_path
+from wip_utils import time_it, load_data
+from solver_profiles import apply_solver_profile
+from wip_even_model import build_set_covering_model, build_scenario_set_covering_model
+
+
+# === Constants ===
+TIME_MATRIX_PATH = "time_matrix.csv"
+CART_DATA_PATH = "cart_data.csv"
+WIP_DATA_FOLDER = "wip_data"
+OUTPUT_FOLDER = "output_results"
+
+M = 100_000
+H = 1
+CART_CAPACITY = 2
+
+# Each scenario is a plain dict; every key except "name" is optional.
+#   qtime_scale (float):     multiplier applied to every remaining Q-time.
+#   loc_delay (dict):        {location: extra time spent at every stop at that location}.
+#   carts_available (int):   limit on the number of selected pairs (one cart each).
+# The set covering model starts every pair from the first cart's location, so a broken
+# cart cannot be told apart from the others: carts_available only reports whether the
+# remaining fleet can still cover all WIPs, and is left out of the defaults.
+DEFAULT_SCENARIOS = [
+    {"name": "base"},
+    {"name": "qtime_-10%", "qtime_scale": 0.9},
+    {"name": "qtime_-20%", "qtime_scale": 0.8},
+    {"name": "loc1_slow", "loc_delay": {"LOC1": 5}},
+]
+
+
+@time_it
+def prepare_scenarios(
+    preprocess_result: Dict,
+    wip_ids: List[str],
+    wip_qtime: Dict[str, float],
+    time_matrix: pd.DataFrame,
+    wip_from: Dict[str, str],
+    wip_to: Dict[str, str],
+    cart_loc: Dict[str, str]
+) -> Dict[str, Any]:
+    """
+    Precompute per-path leg times and build the shared set covering model once.
+
+    Args:
+        preprocess_result (dict): {(wip1, wip2): {path: ((first_wip, second_wip), (time1, time2)), ...}}
+        wip_ids (list): list of WIP IDs.
+        wip_qtime (dict): mapping wip_id to q-time constraint.
+        time_matrix (DataFrame): adjacency matrix indexed and columned by locations.
+        wip_from (dict): mapping wip_id to from location.
+        wip_to (dict): mapping wip_id to to location.
+        cart_loc (dict): mapping cart_id to location (uses first cart as reference here).
+
+    Returns:
+        dict: base structure consumed by solve_scenarios.
+    """
+    c_loc = cart_loc[next(iter(cart_loc))]
+    tm = time_matrix.to_dict(orient="index")
+
+    paths = {}
+    for s, path_dict in preprocess_result.items():
+        entries = []
+        for path in path_dict:
+            stops = expand_path(path, wip_from, wip_to)
+            locs = [c_loc] + [loc for _, _, loc in stops]
+            legs = [tm[locs[i]][locs[i + 1]] for i in range(len(stops))]
+            entries.append((path, stops, legs))
+        paths[s] = entries
+
+    model, y, fleet = build_scenario_set_covering_model(preprocess_result, wip_ids, len(cart_loc))
+
+    return {
+        "model": model,
+        "y": y,
+        "fleet": fleet,
+        "paths": paths,
+        "wip_qtime": wip_qtime,
+        "n_carts": len(cart_loc),
+    }
+
+
+def scenario_coefficients(base: Dict[str, Any], scenario: Dict[str, Any]) -> Tuple[Dict, Dict, Dict]:
+    """
+    Compute per-set cost, penalty and stop times for a scenario.
+
+    Uses the same min-over-paths rule as build_set_covering_model, so the
+    "base" scenario reproduces its coefficients exactly.
+
+    Returns:
+        tuple: (cost_s, penalty_s, stop_times) where stop_times maps
+            (set, path) to the cumulative completion time of each stop.
+    """
+    qtime_scale = scenario.get("qtime_scale", 1.0)
+    loc_delay = scenario.get("loc_delay", {})
+    qtime = {w: q * qtime_scale for w, q in base["wip_qtime"].items()}
+
+    cost_s = {}
+    penalty_s = {}
+    stop_times = {}
+    for s, entries in base["paths"].items():
+        min_cost = penalty_first = penalty_second = float("inf")
+        for path, stops, legs in entries:
+            curr_time = 0
+            times = []
+            for leg, (_, _, loc) in zip(legs, stops):
+                curr_time += leg + loc_delay.get(loc, 0)
+                times.append(curr_time)
+            stop_times[(s, path)] = times
+
+            # Stable sort on time only: equal-time deliveries keep stop order, as in generate_combinations
+            arrivals = sorted(
+                ((t, wip) for t, (wip, action, _) in zip(times, stops) if action == "DELIVERY"),
+                key=lambda arrival: arrival[0]
+            )
+            min_cost = min(min_cost, times[-1])
+            penalty_first = min(penalty_first, arrivals[0][0] - qtime[arrivals[0][1]])
+            penalty_second = min(penalty_second, arrivals[1][0] - qtime[arrivals[1][1]])
+
+        cost_s[s] = min_cost
+        penalty_s[s] = max(0, penalty_first) + max(0, penalty_second)
+
+    return cost_s, penalty_s, stop_times
+
+
+def _build_schedule(base: Dict[str, Any], selected_sets: List, cost_s: Dict, stop_times: Dict) -> pd.DataFrame:
+    """
+    Build dispatch output DataFrame for the selected sets of one scenario.
+    """
+    rows = []
+    for cart_counter, s in enumerate(selected_sets, start=1):
+        cart_id = f"C{cart_counter:02d}"
+
+        # Identify optimal paths matching cost_s within tolerance
+        optimal_paths = [
+            (path, stops) for path, stops, _ in base["paths"][s]
+            if abs(stop_times[(s, path)][-1] - cost_s[s]) < 1e-5
+        ]
+        if not optimal_paths:
+            raise ValueError(f"No optimal path found for set {s} matching cost {cost_s[s]}")
+
+        # Select path with earliest first completion
+        path, stops = min(
+            optimal_paths,
+            key=lambda item: min(
+                t for t, (_, action, _) in zip(stop_times[(s, item[0])], item[1]) if action == "DELIVERY"
+            )
+        )
+
+        for i, ((wip, action, _), complete_time) in enumerate(zip(stops, stop_times[(s, path)])):
+            rows.append([cart_id, i + 1, wip, action, complete_time])
+
+    return pd.DataFrame(rows, columns=["CART_ID", "ORDER", "WIP_ID", "ACTION", "COMPLETE_TIME"])
+
+
+def _summary_row(name: str, status: str, obj_val: float, selected_sets: List, cost_s: Dict, penalty_s: Dict, h: float, M: float) -> Dict[str, Any]:
+    """
+    Summarize one solved scenario as a comparison table row.
+    """
+    return {
+        "SCENARIO": name,
+        "STATUS": status,
+        "OBJECTIVE": obj_val,
+        "TOTAL_COST": h * sum(cost_s[s] for s in selected_sets),
+        "TOTAL_PENALTY": M * sum(penalty_s[s] for s in selected_sets),
+        "LATE_SETS": sum(1 for s in selected_sets if penalty_s[s] > 0),
+        "PAIRS": " ".join(f"{w1}-{w2}" for w1, w2 in selected_sets),
+    }
+
+
+@time_it
+def solve_scenarios(
+    base: Dict[str, Any],
+    scenarios: List[Dict[str, Any]],
+    method: str = "reoptimize",
+    h: float = 1,
+    M: float = 100000
+) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    Solve every scenario on the shared model by changing only objective coefficients and the fleet RHS.
+
+    Args:
+        base (dict): structure returned by prepare_scenarios.
+        scenarios (list): scenario dicts (see DEFAULT_SCENARIOS).
+        method (str): "reoptimize" to update and re-solve the single model in place (faster on
+            the wip_data/ instances), or "multiscenario" to use Gurobi's multi-scenario
+            optimization in one solve.
+        h (float): cost coefficient.
+        M (float): penalty coefficient.
+
+    Returns:
+        tuple: (summary_df, schedules) where
+            - summary_df compares objectives across scenarios.
+            - schedules maps scenario name to its dispatch output DataFrame.
+    """
+    if method not in ("multiscenario", "reoptimize"):
+        raise ValueError(f"Unknown scenario method: {method}")
+
+    model, y, fleet = base["model"], base["y"], base["fleet"]
+    S = list(y.keys())
+    y_vars = [y[s] for s in S]
+
+    apply_solver_profile(model, "set_covering", len(base["wip_qtime"]))
+    coefficients = [scenario_coefficients(base, scenario) for scenario in scenarios]
+
+    rows = []
+    schedules = {}
+
+    if method == "multiscenario":
+        model.NumScenarios = len(scenarios)
+        for k, (scenario, (cost_s, penalty_s, _)) in enumerate(zip(scenarios, coefficients)):
+            model.Params.ScenarioNumber = k
+            model.ScenNName = scenario["name"]
+            model.setAttr("ScenNObj", y_vars, [h * cost_s[s] + M * penalty_s[s] for s in S])
+            fleet.ScenNRHS = scenario.get("carts_available", base["n_carts"])
+        model.optimize()
+
+    for k, (scenario, (cost_s, penalty_s, stop_times)) in enumerate(zip(scenarios, coefficients)):
+        if method == "multiscenario":
+            model.Params.ScenarioNumber = k
+            obj_val = model.ScenNObjVal
+            feasible = model.SolCount > 0 and obj_val < GRB.INFINITY
+            values = model.getAttr("ScenNX", y_vars) if feasible else []
+        else:
+            model.setAttr("Obj", y_vars, [h * cost_s[s] + M * penalty_s[s] for s in S])
+            fleet.RHS = scenario.get("carts_available", base["n_carts"])
+            model.optimize()
+            feasible = model.SolCount > 0
+            obj_val = model.ObjVal if feasible else float("inf")
+            values = model.getAttr("X", y_vars) if feasible else []
+
+        selected_sets = [s for s, v in zip(S, values) if v > 0.5]
+        status = "OPTIMAL" if feasible else "INFEASIBLE"
+
+        rows.append(_summary_row(scenario["name"], status, obj_val, selected_sets, cost_s, penalty_s, h, M))
+        if feasible:
+            schedules[scenario["name"]] = _build_schedule(base, selected_sets, cost_s, stop_times)
+
+    if method == "multiscenario":
+        model.NumScenarios = 0
+
+    return pd.DataFrame(rows), schedules
+
+
+def _perturb_inputs(
+    scenario: Dict[str, Any],
+    time_matrix: pd.DataFrame,
+    wip_qtime: Dict[str, float],
+    c_loc: str
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, float]], Dict[str, float]]:
+    """
+    Apply a scenario to raw model inputs, as a full rebuild would have to.
+
+    A loc_delay is charged once per stop, like scenario_coefficients does: it is added to every
+    leg arriving at the location. build_set_covering_model reads the cart start leg as
+    time_matrix[c_loc][from], so that leg is passed separately as {c_loc: {from: time}}.
+
+    Returns:
+        tuple: (leg_matrix for generate_combinations, start_matrix for the builder, wip_qtime)
+    """
+    loc_delay = scenario.get("loc_delay", {})
+
+    leg_matrix = time_matrix.copy()
+    for loc, delay in loc_delay.items():
+        leg_matrix[loc] += delay
+
+    start_matrix = {
+        c_loc: {loc: time_matrix.loc[c_loc, loc] + loc_delay.get(loc, 0) for loc in time_matrix.columns}
+    }
+
+    qtime_scale = scenario.get("qtime_scale", 1.0)
+    wip_qtime = {w: q * qtime_scale for w, q in wip_qtime.items()}
+    return leg_matrix, start_matrix, wip_qtime
+
+
+def benchmark_scenarios(
+    wip_data_path: str,
+    scenarios: List[Dict[str, Any]],
+    methods: Tuple[str, ...] = ("reoptimize", "multiscenario")
+) -> Dict[str, float]:
+    """
+    Compare scenario throughput of naive full rebuilds against the shared-model API.
+
+    The naive path runs load_data -> generate_combinations -> build_set_covering_model
+    for every scenario. Each method must reach the same objective as the naive path for every
+    scenario before throughput is reported; carts_available scenarios are rejected since the
+    naive model has no fleet constraint.
+    """
+    if any("carts_available" in scenario for scenario in scenarios):
+        raise ValueError("carts_available scenarios cannot be rebuilt naively")
+
+    naive_objectives = []
+    start = time.perf_counter()
+    for scenario in scenarios:
+        time_matrix, wip_ids, wip_from, wip_to, wip_qtime, cart_ids, cart_loc = load_data(
+            TIME_MATRIX_PATH, CART_DATA_PATH, wip_data_path
+        )
+        c_loc = cart_loc[next(iter(cart_loc))]
+        leg_matrix, start_matrix, wip_qtime = _perturb_inputs(scenario, time_matrix, wip_qtime, c_loc)
+        preprocess_result = generate_combinations(wip_ids, wip_from, wip_to, leg_matrix, CART_CAPACITY)
+        model = build_set_covering_model(
+            preprocess_result, wip_ids, wip_qtime, start_matrix, wip_from, cart_loc, CART_CAPACITY, H, M
+        )[0]
+        naive_objectives.append(model.ObjVal)
+    naive_seconds = time.perf_counter() - start
+
+    result = {
+        "scenarios": len(scenarios),
+        "naive_seconds": naive_seconds,
+        "naive_scenarios_per_min": 60 * len(scenarios) / naive_seconds,
+    }
+
+    for method in methods:
+        start = time.perf_counter()
+        time_matrix, wip_ids, wip_from, wip_to, wip_qtime, cart_ids, cart_loc = load_data(
+            TIME_MATRIX_PATH, CART_DATA_PATH, wip_data_path
+        )
+        preprocess_result = generate_combinations(wip_ids, wip_from, wip_to, time_matrix, CART_CAPACITY)
+        base = prepare_scenarios(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, wip_to, cart_loc)
+        summary_df, _ = solve_scenarios(base, scenarios, method, H, M)
+        seconds = time.perf_counter() - start
+
+        for scenario, naive_obj, batched_obj in zip(scenarios, naive_objectives, summary_df["OBJECTIVE"]):
+            if abs(naive_obj - batched_obj) > 1e-6 * max(1.0, abs(naive_obj)):
+                raise ValueError(
+                    f"Scenario {scenario['name']} ({method}): naive objective {naive_obj} "
+                    f"!= shared-model objective {batched_obj}"
+                )
+
+        result[f"{method}_seconds"] = seconds
+        result[f"{method}_scenarios_per_min"] = 60 * len(scenarios) / seconds
+
+    return result
+
+
+def main():
+    """
+    Main workflow:
+    - Run DEFAULT_SCENARIOS on every WIP data file with one shared model
+    - Save the comparison table and every scenario's schedule per file
+    - Benchmark both shared-model methods against naive rebuilds
+    """
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+
+    for wip_data_file in sorted(os.listdir(WIP_DATA_FOLDER)):
+        wip_data_path = os.path.join(WIP_DATA_FOLDER, wip_data_file)
+
+        time_matrix, wip_ids, wip_from, wip_to, wip_qtime, cart_ids, cart_loc = load_data(
+            TIME_MATRIX_PATH, CART_DATA_PATH, wip_data_path
+        )
+        preprocess_result = generate_combinations(wip_ids, wip_from, wip_to, time_matrix, CART_CAPACITY)
+        base = prepare_scenarios(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, wip_to, cart_loc)
+        summary_df, schedules = solve_scenarios(base, DEFAULT_SCENARIOS, "reoptimize", H, M)
+
+        core_part = wip_data_file.replace("wip_data_", "").replace(".csv", "")
+        output_path = os.path.join(OUTPUT_FOLDER, f"wip_{core_part}_scenarios.csv")
+        summary_df.to_csv(output_path, index=False)
+        for name, schedule_df in schedules.items():
+            schedule_df.to_csv(os.path.join(OUTPUT_FOLDER, f"wip_{core_part}_scenario_{name}.csv"), index=False)
+
+        print(summary_df.to_string(index=False))
+        print(benchmark_scenarios(wip_data_path, DEFAULT_SCENARIOS))
+        print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
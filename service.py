@@ -0,0 +1,344 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+
+# === Constants ===
+TIME_MATRIX_PATH = "time_matrix.csv"
+CART_DATA_PATH = "cart_data.csv"
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+M = 100_000
+H = 1
+CART_CAPACITY = 2
+
+MAX_WORKERS = 4           # concurrent solves, each with its own Gurobi environment
+MAX_PENDING = 64          # distinct snapshots queued or solving before requests are rejected
+COALESCE_WINDOW = 0.5     # seconds a finished result keeps answering identical snapshots
+LATENCY_WINDOW = 10_000   # most recent request latencies kept for percentiles
+WORKER_THREADS = max(1, (os.cpu_count() or 1) // MAX_WORKERS)   # Gurobi threads per concurrent solve
+
+SNAPSHOT_FIELDS = ["WIP_ID", "Remaining Q-Time", "FROM", "TO"]
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+_worker = threading.local()
+
+
+class ServiceOverloaded(Exception):
+    """Raised when MAX_PENDING distinct snapshots are already queued or solving."""
+
+
+class InvalidSnapshot(Exception):
+    """Raised when a /dispatch body is not a valid WIP snapshot; answered with 400."""
+
+
+def _init_worker():
+    """
+    Create one Gurobi environment per worker thread; environments are not shared between threads.
+    Each environment gets an equal share of the cores so concurrent solves do not oversubscribe them.
+    """
+    from gurobipy import Env
+
+    env = Env(empty=True)
+    env.setParam("OutputFlag", 0)
+    env.setParam("Threads", WORKER_THREADS)
+    env.start()
+    _worker.env = env
+
+
+def load_state(time_matrix_path: str = TIME_MATRIX_PATH, cart_data_path: str = CART_DATA_PATH) -> Dict[str, Any]:
+    """
+    Load the data kept warm for the lifetime of the service.
+    """
+    import pandas as pd
+    from preprocessing import make_pair_path_cache
+    from wip_utils import load_time_matrix
+
+    time_matrix = load_time_matrix(time_matrix_path)
+    cart_df = pd.read_csv(cart_data_path)
+
+    return {
+        "time_matrix": time_matrix,
+        # Column-major dict, indexed like the DataFrame in build_set_covering_model
+        "time_columns": time_matrix.to_dict(),
+        "pair_paths": make_pair_path_cache(time_matrix.to_dict(orient="index")),
+        "cart_loc": dict(zip(cart_df['CART_ID'], cart_df['INIT_LOC'])),
+        "inflight": {},
+        "latencies": deque(maxlen=LATENCY_WINDOW),
+        "requests": 0,
+        "coalesced": 0,
+        "errors": 0,
+        "pending": 0,
+    }
+
+
+def parse_snapshot(state: Dict[str, Any], body: bytes) -> List[Dict[str, Any]]:
+    """
+    Parse and validate a /dispatch body, raising InvalidSnapshot for anything the client got wrong.
+
+    Returns:
+        list: WIP records with the wip_data CSV columns WIP_ID, Remaining Q-Time, FROM, TO.
+    """
+    try:
+        wips = json.loads(body)["wips"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidSnapshot(f'Body must be a JSON object with a "wips" list ({type(e).__name__}: {e})') from None
+    if not isinstance(wips, list) or not all(isinstance(wip, dict) for wip in wips):
+        raise InvalidSnapshot('"wips" must be a list of objects')
+
+    locations = state["time_columns"]
+    for wip in wips:
+        missing = [field for field in SNAPSHOT_FIELDS if field not in wip]
+        if missing:
+            raise InvalidSnapshot(f"WIP {wip.get('WIP_ID')!r} is missing {missing}")
+        if not isinstance(wip["WIP_ID"], str):
+            raise InvalidSnapshot(f"WIP_ID must be a string, got {wip['WIP_ID']!r}")
+        qtime = wip["Remaining Q-Time"]
+        if isinstance(qtime, bool) or not isinstance(qtime, (int, float)):
+            raise InvalidSnapshot(f"WIP {wip['WIP_ID']}: Remaining Q-Time must be a number, got {qtime!r}")
+        for field in ("FROM", "TO"):
+            if not isinstance(wip[field], str) or wip[field] not in locations:
+                raise InvalidSnapshot(f"WIP {wip['WIP_ID']}: unknown {field} location {wip[field]!r}")
+
+    wip_ids = [wip["WIP_ID"] for wip in wips]
+    if not wip_ids or len(wip_ids) % CART_CAPACITY:
+        raise InvalidSnapshot(f"Snapshot must contain a positive multiple of {CART_CAPACITY} WIPs")
+    if len(set(wip_ids)) != len(wip_ids):
+        raise InvalidSnapshot("Duplicate WIP_ID in snapshot")
+    return wips
+
+
+def solve_snapshot(state: Dict[str, Any], wips: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Solve one WIP snapshot with the set covering model on the calling worker's environment.
+
+    Args:
+        state (dict): structure returned by load_state.
+        wips (list): WIP records validated by parse_snapshot.
+
+    Returns:
+        dict: {"objective": float, "schedule": [{CART_ID, ORDER, WIP_ID, ACTION, COMPLETE_TIME}, ...]}
+    """
+    from preprocessing import generate_combinations_cached
+    from solver_profiles import apply_solver_profile
+    from wip_utils import construct_output_from_selected_sets
+    from wip_even_model import construct_set_covering_model
+
+    wip_ids = [wip["WIP_ID"] for wip in wips]
+    wip_from = {wip["WIP_ID"]: wip["FROM"] for wip in wips}
+    wip_to = {wip["WIP_ID"]: wip["TO"] for wip in wips}
+    wip_qtime = {wip["WIP_ID"]: wip["Remaining Q-Time"] for wip in wips}
+
+    preprocess_result = generate_combinations_cached(
+        wip_ids, wip_from, wip_to, state["pair_paths"], CART_CAPACITY
+    )
+    model, y, cost_s, penalty_s = construct_set_covering_model(
+        preprocess_result=preprocess_result,
+        wip_ids=wip_ids,
+        wip_qtime=wip_qtime,
+        time_matrix=state["time_columns"],
+        wip_from=wip_from,
+        cart_loc=state["cart_loc"],
+        cart_capacity=CART_CAPACITY,
+        h=H,
+        M=M,
+        env=_worker.env
+    )
+    apply_solver_profile(model, "set_covering", len(wip_ids))
+    # A tuned profile may set Threads; keep each solve within its share of the cores
+    model.Params.Threads = WORKER_THREADS
+    model.optimize()
+    if model.SolCount == 0:
+        raise RuntimeError(f"No feasible dispatch plan for snapshot (status {model.Status})")
+
+    initial_cart_loc = state["cart_loc"][next(iter(state["cart_loc"]))]
+    output_df = construct_output_from_selected_sets(
+        y,
+        cost_s=cost_s,
+        penalty_s=penalty_s,
+        preprocess_result=preprocess_result,
+        time_matrix=state["time_matrix"],
+        wip_from=wip_from,
+        wip_to=wip_to,
+        initial_cart_loc=initial_cart_loc
+    )
+
+    return {"objective": model.ObjVal, "schedule": output_df.to_dict(orient="records")}
+
+
+def snapshot_key(wips: List[Dict[str, Any]]) -> str:
+    """
+    Order-independent key identifying identical snapshots.
+    """
+    canonical = json.dumps(sorted(wips, key=lambda wip: wip["WIP_ID"]), sort_keys=True)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+async def dispatch(state: Dict[str, Any], executor: ThreadPoolExecutor, wips: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Solve a snapshot off the event loop, sharing one solve among identical concurrent requests.
+    """
+    key = snapshot_key(wips)
+    future = state["inflight"].get(key)
+    if future is not None:
+        state["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    if state["pending"] >= MAX_PENDING:
+        raise ServiceOverloaded(f"{MAX_PENDING} snapshots already pending")
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, solve_snapshot, state, wips)
+    state["inflight"][key] = future
+    state["pending"] += 1
+    try:
+        return await asyncio.shield(future)
+    finally:
+        state["pending"] -= 1
+        loop.call_later(COALESCE_WINDOW, state["inflight"].pop, key, None)
+
+
+def latency_metrics(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Request counters and latency percentiles (ms) over the last LATENCY_WINDOW dispatch requests.
+    """
+    latencies = sorted(state["latencies"])
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return 1000 * latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]
+
+    return {
+        "requests": state["requests"],
+        "coalesced": state["coalesced"],
+        "errors": state["errors"],
+        "pending": state["pending"],
+        "latency_ms": {f"p{p}": percentile(p) for p in (50, 90, 95, 99, 100)},
+        "pair_cache": state["pair_paths"].cache_info()._asdict(),
+    }
+
+
+async def route(state, executor, method, path, body):
+    """
+    Map one HTTP request to (status, JSON payload).
+    """
+    if method == "GET" and path == "/metrics":
+        return 200, latency_metrics(state)
+    if method == "GET" and path == "/health":
+        return 200, {"status": "ok"}
+    if method != "POST" or path != "/dispatch":
+        return 404, {"error": f"No route for {method} {path}"}
+
+    state["requests"] += 1
+    start = time.perf_counter()
+    try:
+        wips = parse_snapshot(state, body)
+        result = await dispatch(state, executor, wips)
+    except InvalidSnapshot as e:
+        state["errors"] += 1
+        return 400, {"error": str(e)}
+    except ServiceOverloaded as e:
+        state["errors"] += 1
+        return 503, {"error": str(e)}
+    except Exception as e:
+        # Solver and output failures are on the server side, whatever exception they raise
+        state["errors"] += 1
+        return 500, {"error": f"{type(e).__name__}: {e}"}
+    state["latencies"].append(time.perf_counter() - start)
+    return 200, result
+
+
+def _json_default(value):
+    # numpy scalars from the time matrix
+    return value.item()
+
+
+async def handle_connection(reader, writer, state, executor):
+    """
+    Serve HTTP/1.1 requests on one keep-alive connection.
+    """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode().split(" ", 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+            status, payload = await route(state, executor, method, path, body)
+            data = json.dumps(payload, default=_json_default).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+def _warm_workers(executor: ThreadPoolExecutor) -> None:
+    """
+    Start every worker thread (and its Gurobi environment) before the first request arrives.
+    """
+    barrier = threading.Barrier(MAX_WORKERS)
+    for future in [executor.submit(barrier.wait) for _ in range(MAX_WORKERS)]:
+        future.result()
+
+
+async def serve(address):
+    """
+    Run the dispatch service on a TCP port (int) or a Unix socket path (str).
+    """
+    state = load_state()
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker)
+    _warm_workers(executor)
+
+    handler = functools.partial(handle_connection, state=state, executor=executor)
+    if isinstance(address, int):
+        server = await asyncio.start_server(handler, HOST, address)
+        print(f"Dispatch service on http://{HOST}:{address}")
+    else:
+        server = await asyncio.start_unix_server(handler, address)
+        print(f"Dispatch service on unix socket {address}")
+
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """
+    Usage: python service.py [port | unix_socket_path]
+    """
+    arg = sys.argv[1] if len(sys.argv) > 1 else str(PORT)
+    address = int(arg) if arg.isdigit() else arg
+    asyncio.run(serve(address))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+import heapq
+import os
+import random
+import sys
+import time
+from collections import deque
+from itertools import count
+import pandas as pd
+from typing import Any, Callable, Dict, List, Tuple
+
+from preprocessing import expand_path
+from wip_utils import time_it, load_time_matrix
+
+
+# === Constants ===
+TIME_MATRIX_PATH = "time_matrix.csv"
+CART_DATA_PATH = "cart_data.csv"
+WIP_DATA_FOLDER = "wip_data"
+
+M = 100_000
+H = 1
+CART_CAPACITY = 2
+
+# Simulated time is in minutes (the unit of XFER_TIME and Remaining Q-Time)
+TIME_UNIT_SECONDS = 60
+WEEK = 7 * 24 * 60
+
+# Event kinds, in the order they are processed when they share a timestamp
+STOP, ARRIVAL, DISPATCH, TRIGGER = range(4)
+
+# A dispatch policy is called as policy(now, pending, idle_carts, time_dict, busy_carts) where
+#   pending (dict):    {wip_id: {"FROM": loc, "TO": loc, "DUE": absolute due time}}
+#   idle_carts (dict): {cart_id: current location}
+#   time_dict (dict):  {from_loc: {to_loc: transfer time}}
+#   busy_carts (dict): {cart_id: {"NEXT": stop being driven to, "STOPS": [stops after it],
+#                                 "ON_BOARD": [wip_ids picked up and not delivered]}}
+# and returns [(cart_id, [(wip_id, action, location), ...]), ...].
+# For a busy cart the returned stops replace its "STOPS" (re-dispatch): they must deliver
+# every WIP on board or being picked up at "NEXT", and may drop, reorder or add pickups of
+# WIPs that are pending or not yet picked up by that cart. Dropped WIPs become pending again.
+Policy = Callable[
+    [float, Dict[str, Dict[str, Any]], Dict[str, str], Dict[str, Dict[str, float]], Dict[str, Dict[str, Any]]],
+    List[Tuple[str, List[Tuple[str, str, str]]]]
+]
+
+
+def generate_wip_arrivals(
+    locations: List[str],
+    horizon: float,
+    arrival_rate: float,
+    qtime_range: Tuple[float, float] = (10, 60),
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Generate Poisson WIP arrivals with random routes and uniform remaining Q-times.
+
+    Args:
+        locations (list): candidate FROM/TO locations.
+        horizon (float): last possible arrival time.
+        arrival_rate (float): expected arrivals per unit time.
+        qtime_range (tuple): (low, high) bounds of the remaining Q-time at arrival.
+        seed (int): random seed.
+
+    Returns:
+        list: WIP dicts with keys WIP_ID, ARRIVAL, FROM, TO, Remaining Q-Time.
+    """
+    rng = random.Random(seed)
+    arrivals = []
+    t = rng.expovariate(arrival_rate)
+    while t <= horizon:
+        loc_from, loc_to = rng.sample(locations, 2)
+        arrivals.append({
+            "WIP_ID": f"W{len(arrivals) + 1:06d}",
+            "ARRIVAL": t,
+            "FROM": loc_from,
+            "TO": loc_to,
+            "Remaining Q-Time": rng.randint(*qtime_range),
+        })
+        t += rng.expovariate(arrival_rate)
+    return arrivals
+
+
+def load_wip_snapshot(wip_data_path: str) -> List[Dict[str, Any]]:
+    """
+    Load a static WIP CSV snapshot as arrivals all released at time 0.
+    """
+    wip_df = pd.read_csv(wip_data_path)
+    wip_df["ARRIVAL"] = 0
+    return wip_df.to_dict(orient="records")
+
+
+def greedy_policy(now, pending, idle_carts, time_dict, busy_carts=None):
+    """
+    Send the nearest idle cart to each pending WIP in earliest-due order, one WIP per trip.
+    """
+    assignments = []
+    free = dict(idle_carts)
+    for wip_id in sorted(pending, key=lambda w: pending[w]["DUE"]):
+        if not free:
+            break
+        wip = pending[wip_id]
+        cart = min(free, key=lambda c: time_dict[free[c]][wip["FROM"]])
+        del free[cart]
+        assignments.append((cart, [(wip_id, "PICKUP", wip["FROM"]), (wip_id, "DELIVERY", wip["TO"])]))
+    return assignments
+
+
+def make_set_covering_policy(time_matrix: pd.DataFrame, h: float = 1, M: float = 100000) -> Policy:
+    """
+    Build a policy that pairs the most urgent pending WIPs with the set covering model.
+
+    Takes the 2 * n earliest-due WIPs, where n is the number of idle carts that can be
+    filled with a pair; WIPs left over are then handled by greedy_policy on the carts
+    that are still idle.
+    """
+    from gurobipy import Env
+    from preprocessing import make_pair_path_cache, generate_combinations_cached
+    from solver_profiles import apply_solver_profile
+    from wip_even_model import construct_set_covering_model
+
+    # Own silent environment, leaving the process-wide default untouched
+    env = Env(empty=True)
+    env.setParam("OutputFlag", 0)
+    env.start()
+
+    # Column-major dict, indexed like the DataFrame in construct_set_covering_model
+    time_columns = time_matrix.to_dict()
+    pair_paths = make_pair_path_cache(time_matrix.to_dict(orient="index"))
+
+    def policy(now, pending, idle_carts, time_dict, busy_carts=None):
+        n_pairs = min(len(idle_carts), len(pending) // CART_CAPACITY)
+        if n_pairs == 0:
+            return greedy_policy(now, pending, idle_carts, time_dict)
+
+        wip_ids = sorted(pending, key=lambda w: pending[w]["DUE"])[:CART_CAPACITY * n_pairs]
+        wip_from = {w: pending[w]["FROM"] for w in wip_ids}
+        wip_to = {w: pending[w]["TO"] for w in wip_ids}
+        wip_qtime = {w: pending[w]["DUE"] - now for w in wip_ids}
+
+        preprocess_result = generate_combinations_cached(wip_ids, wip_from, wip_to, pair_paths, CART_CAPACITY)
+        model, y, cost_s, penalty_s = construct_set_covering_model(
+            preprocess_result, wip_ids, wip_qtime, time_columns, wip_from, idle_carts, CART_CAPACITY, h, M, env
+        )
+        apply_solver_profile(model, "set_covering", len(wip_ids))
+        model.optimize()
+
+        def route_cost(cart_loc, item):
+            path, ((first_wip, second_wip), (first_time, second_time)) = item
+            t_start = time_dict[cart_loc][wip_from[path[0]]]
+            lateness = (
+                max(0, t_start + first_time - wip_qtime[first_wip]) +
+                max(0, t_start + second_time - wip_qtime[second_wip])
+            )
+            return h * (t_start + second_time) + M * lateness
+
+        # Give each selected pair the idle cart and path with the lowest cost
+        assignments = []
+        free = dict(idle_carts)
+        for s in preprocess_result:
+            if y[s].X < 0.5:
+                continue
+            cart, path = min(
+                ((c, item) for c in free for item in preprocess_result[s].items()),
+                key=lambda cp: route_cost(free[cp[0]], cp[1])
+            )
+            del free[cart]
+            assignments.append((cart, expand_path(path[0], wip_from, wip_to)))
+
+        # Odd or surplus WIPs go out single on the carts that are still idle
+        rest = {w: info for w, info in pending.items() if w not in wip_from}
+        return assignments + greedy_policy(now, rest, free, time_dict)
+
+    return policy
+
+
+@time_it
+def simulate(
+    arrivals: List[Dict[str, Any]],
+    time_dict: Dict[str, Dict[str, float]],
+    cart_loc: Dict[str, str],
+    policy: Policy,
+    trigger_interval: float = 5,
+    compute_time_scale: float = 1 / TIME_UNIT_SECONDS,
+    compute_delay: float = None,
+    horizon: float = None,
+    max_stalled_triggers: int = 3,
+    h: float = 1,
+    M: float = 100000
+) -> Dict[str, float]:
+    """
+    Replay WIP arrivals through a dispatch policy with a discrete-event simulation.
+
+    The policy is called every trigger_interval while WIPs are pending and carts exist.
+    Its wall-clock compute time times compute_time_scale (or a fixed compute_delay) elapses
+    in simulated time before the assignments take effect; no new call is made meanwhile.
+
+    The run ends when every WIP is delivered, at horizon, or once max_stalled_triggers
+    consecutive triggers after the last arrival find WIPs pending, all past due, and no
+    cart moving.
+
+    Args:
+        arrivals (list): WIP dicts from generate_wip_arrivals or load_wip_snapshot.
+        time_dict (dict): {from_loc: {to_loc: transfer time}}.
+        cart_loc (dict): mapping cart_id to initial location.
+        policy (callable): dispatch policy, see Policy.
+        trigger_interval (float): simulated time between policy calls.
+        compute_time_scale (float): simulated time units per wall-clock second of policy compute.
+        compute_delay (float): fixed simulated compute delay overriding the measured one.
+        horizon (float): simulated time at which the run stops (None for no limit).
+        max_stalled_triggers (int): triggers without progress tolerated once every pending WIP
+            is past due and no WIP is left to arrive.
+        h (float): cost coefficient.
+        M (float): penalty coefficient.
+
+    Returns:
+        dict: total_penalty, total_transport and total_cost as in cal_obj_val (transport is
+            cart travel time), plus delivery and dispatch counters. WIPs still pending or
+            on a cart when the run ends count as undelivered, and their lateness at the end
+            of the run, max(0, end_time - DUE), is included in total_penalty.
+    """
+    events = []
+    seq = count()
+
+    def push(t, kind, payload=None):
+        heapq.heappush(events, (t, kind, next(seq), payload))
+
+    for wip in arrivals:
+        push(wip["ARRIVAL"], ARRIVAL, wip)
+    push(0, TRIGGER)
+
+    wip_info = {}
+    pending = {}
+    idle = dict(cart_loc)
+    cart_pos = dict(cart_loc)
+    routes = {}
+    on_board = {cart: set() for cart in cart_loc}
+    open_wips = set()
+    arrivals_left = len(arrivals)
+    solving = False
+    stalled_triggers = 0
+
+    total_lateness = 0
+    total_travel = 0
+    delivered = 0
+    dispatch_calls = 0
+    redispatches = 0
+    compute_seconds = 0.0
+    n_events = 0
+    now = 0
+
+    def start_next_stop(cart, t):
+        nonlocal total_travel
+        travel = time_dict[cart_pos[cart]][routes[cart][0][2]]
+        total_travel += travel
+        push(t + travel, STOP, cart)
+
+    def busy_carts():
+        return {
+            cart: {"NEXT": route[0], "STOPS": list(route)[1:], "ON_BOARD": sorted(on_board[cart])}
+            for cart, route in routes.items()
+        }
+
+    def apply_route(cart, stops):
+        """Replace everything after the stop in progress; return False if the stops are invalid."""
+        if cart not in cart_loc:
+            return False
+        route = list(routes.get(cart, ()))
+        in_progress, rest = route[:1], route[1:]
+
+        # WIPs that must be delivered by the new stops
+        committed = set(on_board[cart])
+        for wip_id, action, _ in in_progress:
+            if action == "PICKUP":
+                committed.add(wip_id)
+            else:
+                committed.discard(wip_id)
+        reclaimable = {wip_id for wip_id, action, _ in rest if action == "PICKUP"}
+
+        picked, dropped_off = set(), set()
+        for wip_id, action, loc in stops:
+            info = wip_info.get(wip_id)
+            if info is None:
+                return False
+            if action == "PICKUP":
+                if wip_id in picked or (wip_id not in pending and wip_id not in reclaimable) or loc != info["FROM"]:
+                    return False
+                picked.add(wip_id)
+            elif action == "DELIVERY":
+                if wip_id in dropped_off or (wip_id not in picked and wip_id not in committed) or loc != info["TO"]:
+                    return False
+                dropped_off.add(wip_id)
+            else:
+                return False
+        if dropped_off != picked | committed:
+            return False
+
+        for wip_id in reclaimable - picked:
+            pending[wip_id] = wip_info[wip_id]
+        for wip_id in picked:
+            pending.pop(wip_id, None)
+
+        if in_progress or stops:
+            routes[cart] = deque(in_progress + list(stops))
+            idle.pop(cart, None)
+            if not in_progress:
+                start_next_stop(cart, now)
+        return True
+
+    while events:
+        now, kind, _, payload = heapq.heappop(events)
+        if horizon is not None and now > horizon:
+            now = horizon
+            break
+        n_events += 1
+
+        if kind == STOP:
+            wip_id, action, loc = routes[payload].popleft()
+            cart_pos[payload] = loc
+            if action == "PICKUP":
+                on_board[payload].add(wip_id)
+            else:
+                on_board[payload].discard(wip_id)
+                open_wips.discard(wip_id)
+                total_lateness += max(0, now - wip_info[wip_id]["DUE"])
+                delivered += 1
+            if routes[payload]:
+                start_next_stop(payload, now)
+            else:
+                del routes[payload]
+                idle[payload] = loc
+
+        elif kind == ARRIVAL:
+            arrivals_left -= 1
+            open_wips.add(payload["WIP_ID"])
+            wip_info[payload["WIP_ID"]] = pending[payload["WIP_ID"]] = {
+                "FROM": payload["FROM"],
+                "TO": payload["TO"],
+                "DUE": payload["ARRIVAL"] + payload["Remaining Q-Time"],
+            }
+
+        elif kind == DISPATCH:
+            solving = False
+            for cart, stops in payload:
+                was_busy = cart in routes
+                if apply_route(cart, stops) and was_busy:
+                    redispatches += 1
+
+        elif kind == TRIGGER:
+            # Nothing will change any more if no WIP can arrive, no cart is moving and
+            # the last policy call (if any) has returned. Stalling only counts once every
+            # pending WIP is past due, so abandoned WIPs are charged lateness at the end.
+            if arrivals_left or routes or not pending:
+                stalled_triggers = 0
+            elif not solving and all(info["DUE"] <= now for info in pending.values()):
+                stalled_triggers += 1
+
+            if not solving and pending and cart_loc:
+                busy = busy_carts()
+                snapshot = (dict(pending), dict(idle))
+
+                start = time.perf_counter()
+                assignments = policy(now, *snapshot, time_dict, busy)
+                elapsed = time.perf_counter() - start
+
+                dispatch_calls += 1
+                compute_seconds += elapsed
+                solving = True
+                delay = compute_delay if compute_delay is not None else elapsed * compute_time_scale
+                push(now + delay, DISPATCH, assignments)
+
+            if (arrivals_left or pending or solving) and stalled_triggers < max_stalled_triggers:
+                push(now + trigger_interval, TRIGGER)
+
+    # WIPs still pending or on a cart are charged their lateness at the end of the run
+    undelivered_lateness = sum(max(0, now - wip_info[wip_id]["DUE"]) for wip_id in open_wips)
+    total_lateness += undelivered_lateness
+
+    total_penalty = total_lateness * M
+    total_transport = total_travel * h
+
+    return {
+        "total_penalty": total_penalty,
+        "total_transport": total_transport,
+        "total_cost": total_penalty + total_transport,
+        "delivered": delivered,
+        "undelivered": len(open_wips),
+        "undelivered_lateness": undelivered_lateness,
+        "pending": len(pending),
+        "not_arrived": arrivals_left,
+        "dispatch_calls": dispatch_calls,
+        "redispatches": redispatches,
+        "compute_seconds": compute_seconds,
+        "events": n_events,
+        "end_time": now,
+    }
+
+
+def main():
+    """
+    Main workflow:
+    - Replay every static WIP snapshot
+    - Replay a week of generated fab traffic
+    Usage: python simulator.py [greedy|set_covering]
+    """
+    policy_name = sys.argv[1] if len(sys.argv) > 1 else "greedy"
+
+    time_matrix = load_time_matrix(TIME_MATRIX_PATH)
+    time_dict = time_matrix.to_dict(orient="index")
+    cart_df = pd.read_csv(CART_DATA_PATH)
+    cart_loc = dict(zip(cart_df['CART_ID'], cart_df['INIT_LOC']))
+
+    if policy_name == "greedy":
+        policy = greedy_policy
+    elif policy_name == "set_covering":
+        policy = make_set_covering_policy(time_matrix, H, M)
+    else:
+        raise ValueError(f"Unknown policy: {policy_name}")
+
+    for wip_data_file in sorted(os.listdir(WIP_DATA_FOLDER)):
+        arrivals = load_wip_snapshot(os.path.join(WIP_DATA_FOLDER, wip_data_file))
+        print(wip_data_file, simulate(arrivals, time_dict, cart_loc, policy, h=H, M=M))
+
+    arrivals = generate_wip_arrivals(list(time_matrix.index), WEEK, arrival_rate=0.3)
+    start = time.perf_counter()
+    report = simulate(arrivals, time_dict, cart_loc, policy, h=H, M=M)
+    print(f"Week replay ({len(arrivals)} WIPs) in {time.perf_counter() - start:.2f} s:", report)
+
+
+if __name__ == "__main__":
+    main()
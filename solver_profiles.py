@@ -0,0 +1,71 @@
+import json
+import os
+from typing import Any, Dict
+
+
+# === Constants ===
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solver_profiles.json")
+
+# (max number of WIPs, bucket name), checked in order
+SIZE_BUCKETS = [
+    (10, "small"),
+    (40, "medium"),
+    (float("inf"), "large"),
+]
+
+_profiles_cache = {}
+
+
+def size_bucket(n_wips: int) -> str:
+    """
+    Map an instance size to its tuning bucket name.
+    """
+    for max_wips, name in SIZE_BUCKETS:
+        if n_wips <= max_wips:
+            return name
+    return SIZE_BUCKETS[-1][1]
+
+
+def load_profiles(path: str = PROFILE_PATH) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Load stored profiles as {model_type: {bucket: {param: value}}}; empty if none are stored.
+    """
+    if path not in _profiles_cache:
+        if os.path.exists(path):
+            with open(path) as f:
+                _profiles_cache[path] = json.load(f)
+        else:
+            _profiles_cache[path] = {}
+    return _profiles_cache[path]
+
+
+def save_profiles(profiles: Dict[str, Dict[str, Dict[str, Any]]], path: str = PROFILE_PATH) -> None:
+    """
+    Write profiles to disk and refresh the in-process cache.
+    """
+    with open(path, "w") as f:
+        json.dump(profiles, f, indent=2, sort_keys=True)
+    _profiles_cache[path] = profiles
+
+
+def get_profile(model_type: str, n_wips: int, path: str = PROFILE_PATH) -> Dict[str, Any]:
+    """
+    Return the stored Gurobi parameters for a model type and instance size ({} means defaults).
+    """
+    return load_profiles(path).get(model_type, {}).get(size_bucket(n_wips), {})
+
+
+def apply_solver_profile(model: Any, model_type: str, n_wips: int, params: Dict[str, Any] = None) -> None:
+    """
+    Set Gurobi parameters on a model before optimize().
+
+    Args:
+        model (Model): Gurobi model.
+        model_type (str): builder name the profile was tuned for, e.g. "set_covering".
+        n_wips (int): number of WIPs in the instance, used to pick the size bucket.
+        params (dict): explicit parameters overriding the stored profile.
+    """
+    if params is None:
+        params = get_profile(model_type, n_wips)
+    for name, value in params.items():
+        model.setParam(name, value)
@@ -0,0 +1,78 @@
+import csv
+import os
+import numpy as np
+
+
+def binary_path(time_matrix_path: str) -> str:
+    """
+    Path of the precompiled binary form of a time matrix CSV.
+    """
+    return os.path.splitext(time_matrix_path)[0] + ".npz"
+
+
+def source_signature(time_matrix_path: str) -> np.ndarray:
+    """
+    Size and nanosecond mtime of the CSV, stored with the binary form to detect any change to the source.
+    """
+    stat = os.stat(time_matrix_path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def _parse_xfer_time(value: str, time_matrix_path: str, line_num: int) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{time_matrix_path}:{line_num}: XFER_TIME must be a number, got {value!r}") from None
+
+
+def compile_time_matrix(time_matrix_path: str) -> np.ndarray:
+    """
+    Parse the time matrix CSV into a dense array indexed by LOC number.
+
+    Entry [i, j] is the transfer time from LOC{i} to LOC{j}; -1 marks pairs missing from the CSV.
+    The array is int64 when every transfer time is integral and float64 otherwise.
+    """
+    with open(time_matrix_path, newline="") as f:
+        rows = [
+            (
+                int(row["FROM"].replace("LOC", "")),
+                int(row["TO"].replace("LOC", "")),
+                _parse_xfer_time(row["XFER_TIME"], time_matrix_path, line_num)
+            )
+            for line_num, row in enumerate(csv.DictReader(f), start=2)
+        ]
+
+    integral = all(xfer_time.is_integer() for _, _, xfer_time in rows)
+    size = max(max(i, j) for i, j, _ in rows) + 1
+    matrix = np.full((size, size), -1, dtype=np.int64 if integral else np.float64)
+    for i, j, xfer_time in rows:
+        matrix[i, j] = xfer_time
+    return matrix
+
+
+def load_time_array(time_matrix_path: str) -> np.ndarray:
+    """
+    Load the time matrix as a dense array, recompiling the binary form when it is missing or
+    was compiled from a CSV with a different size or mtime.
+    """
+    bin_path = binary_path(time_matrix_path)
+    signature = source_signature(time_matrix_path)
+    try:
+        with np.load(bin_path) as cached:
+            if np.array_equal(cached["source"], signature):
+                return cached["matrix"]
+    except (OSError, KeyError, ValueError):
+        pass
+
+    matrix = compile_time_matrix(time_matrix_path)
+
+    # Write atomically so concurrent invocations never read a partial file
+    tmp_path = f"{bin_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, matrix=matrix, source=signature)
+        os.replace(tmp_path, bin_path)
+    except OSError:
+        pass
+
+    return matrix
@@ -0,0 +1,325 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import pandas as pd
+from typing import Any, Dict, List
+
+from preprocessing import generate_combinations
+from wip_utils import time_it, load_data
+from wip_even_model import (
+    build_wip_even_model_1, build_wip_even_model_2, build_set_covering_model,
+    construct_wip_even_model_1, construct_wip_even_model_2, construct_set_covering_model,
+)
+from solver_profiles import size_bucket, load_profiles, save_profiles
+
+
+# === Constants ===
+TIME_MATRIX_PATH = "time_matrix.csv"
+CART_DATA_PATH = "cart_data.csv"
+WIP_DATA_FOLDER = "wip_data"
+OUTPUT_FOLDER = "output_results"
+
+M = 100_000
+H = 1
+CART_CAPACITY = 2
+
+MODEL_BUILDERS = {
+    "even_model_1": build_wip_even_model_1,
+    "even_model_2": build_wip_even_model_2,
+    "set_covering": build_set_covering_model,
+}
+
+MODEL_CONSTRUCTORS = {
+    "even_model_1": construct_wip_even_model_1,
+    "even_model_2": construct_wip_even_model_2,
+    "set_covering": construct_set_covering_model,
+}
+
+# Search space; every candidate profile is a subset of these settings
+PARAM_SPACE = {
+    "MIPFocus": [0, 1, 2, 3],
+    "Presolve": [-1, 0, 1, 2],
+    "Cuts": [-1, 0, 1, 2, 3],
+    "Threads": [0, 1, 2, 4],
+}
+
+GENERATED_SIZES = [10, 20, 30, 40, 60]
+GENERATED_PER_SIZE = 3
+TIME_LIMIT = 60
+TUNE_TIME_LIMIT = 120
+
+# Set by the tuning harness itself, so never part of a stored profile
+HARNESS_PARAMS = {"TimeLimit", "TuneTimeLimit", "OutputFlag", "LogToConsole", "LogFile"}
+
+
+def generate_instance(name: str, locations: List[str], n_wips: int, rng: random.Random) -> Dict[str, Any]:
+    """
+    Generate a random WIP instance with the same fields load_data returns.
+    """
+    wip_ids = [f"W{i + 1:02d}" for i in range(n_wips)]
+    wip_from, wip_to, wip_qtime = {}, {}, {}
+    for w in wip_ids:
+        wip_from[w], wip_to[w] = rng.sample(locations, 2)
+        wip_qtime[w] = rng.randint(10, 60)
+    return {"name": name, "wip_ids": wip_ids, "wip_from": wip_from, "wip_to": wip_to, "wip_qtime": wip_qtime}
+
+
+@time_it
+def load_corpus(seed: int = 0):
+    """
+    Load the wip_data/ instances plus generated ones, with pair combinations precomputed.
+
+    Returns:
+        tuple: (instances, time_matrix, cart_loc)
+    """
+    instances = []
+    for wip_data_file in sorted(os.listdir(WIP_DATA_FOLDER)):
+        time_matrix, wip_ids, wip_from, wip_to, wip_qtime, cart_ids, cart_loc = load_data(
+            TIME_MATRIX_PATH, CART_DATA_PATH, os.path.join(WIP_DATA_FOLDER, wip_data_file)
+        )
+        instances.append({
+            "name": wip_data_file, "wip_ids": wip_ids, "wip_from": wip_from, "wip_to": wip_to, "wip_qtime": wip_qtime
+        })
+
+    rng = random.Random(seed)
+    locations = list(time_matrix.index)
+    for n_wips in GENERATED_SIZES:
+        for k in range(GENERATED_PER_SIZE):
+            instances.append(generate_instance(f"generated_{n_wips}_{k}", locations, n_wips, rng))
+
+    for instance in instances:
+        instance["preprocess_result"] = generate_combinations(
+            instance["wip_ids"], instance["wip_from"], instance["wip_to"], time_matrix, CART_CAPACITY
+        )
+
+    return instances, time_matrix, cart_loc
+
+
+def solve_time(model_type: str, instance: Dict[str, Any], params: Dict[str, Any], time_matrix: pd.DataFrame, cart_loc: Dict[str, str]) -> float:
+    """
+    Solve one instance with a candidate profile and return Gurobi's runtime in seconds.
+    """
+    model = MODEL_BUILDERS[model_type](
+        instance["preprocess_result"],
+        instance["wip_ids"],
+        instance["wip_qtime"],
+        time_matrix,
+        instance["wip_from"],
+        cart_loc,
+        CART_CAPACITY,
+        H,
+        M,
+        params={**params, "TimeLimit": TIME_LIMIT, "OutputFlag": 0}
+    )[0]
+    return model.Runtime
+
+
+def random_candidates(n_candidates: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """
+    Sample distinct profiles from PARAM_SPACE; the Gurobi defaults ({}) always come first.
+    """
+    candidates = [{}]
+    seen = {"{}"}
+    for _ in range(50 * n_candidates):
+        if len(candidates) > n_candidates:
+            break
+        profile = {
+            name: rng.choice(values)
+            for name, values in PARAM_SPACE.items()
+            if rng.random() < 0.5
+        }
+        key = json.dumps(profile, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(profile)
+    return candidates
+
+
+def read_param_file(path: str) -> Dict[str, Any]:
+    """
+    Parse a Gurobi .prm file (one "Name Value" per line) into a profile, dropping HARNESS_PARAMS.
+    """
+    profile = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            name, value = line.split(None, 1)
+            if name in HARNESS_PARAMS:
+                continue
+            try:
+                profile[name] = int(value)
+            except ValueError:
+                try:
+                    profile[name] = float(value)
+                except ValueError:
+                    profile[name] = value
+    return profile
+
+
+def gurobi_tune_candidates(model_type: str, instances: List[Dict[str, Any]], time_matrix: pd.DataFrame, cart_loc: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Run Gurobi's tuning tool on each constructed (unsolved) instance model and collect
+    its full best parameter set, not only the PARAM_SPACE settings.
+    """
+    candidates = [{}]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        param_path = os.path.join(tmp_dir, "tuned.prm")
+        for instance in instances:
+            model = MODEL_CONSTRUCTORS[model_type](
+                instance["preprocess_result"], instance["wip_ids"], instance["wip_qtime"], time_matrix,
+                instance["wip_from"], cart_loc, CART_CAPACITY, H, M
+            )[0]
+            model.Params.OutputFlag = 0
+            model.Params.TimeLimit = TIME_LIMIT
+            model.Params.TuneTimeLimit = TUNE_TIME_LIMIT
+            model.tune()
+            if model.TuneResultCount == 0:
+                continue
+            model.getTuneResult(0)
+            # A .prm file lists every parameter that differs from its default
+            model.write(param_path)
+            profile = read_param_file(param_path)
+            if profile not in candidates:
+                candidates.append(profile)
+    return candidates
+
+
+def _solve_missing(model_type, candidates, indices, instances, time_matrix, cart_loc, runtimes):
+    """
+    Fill runtimes[(candidate index, instance name)] for every pair not solved yet.
+    """
+    for idx in indices:
+        for instance in instances:
+            key = (idx, instance["name"])
+            if key not in runtimes:
+                runtimes[key] = solve_time(model_type, instance, candidates[idx], time_matrix, cart_loc)
+
+
+def _median(runtimes, idx, instances):
+    return pd.Series([runtimes[(idx, instance["name"])] for instance in instances]).median()
+
+
+@time_it
+def tune_bucket(
+    model_type: str,
+    instances: List[Dict[str, Any]],
+    time_matrix: pd.DataFrame,
+    cart_loc: Dict[str, str],
+    method: str = "halving",
+    n_candidates: int = 16,
+    seed: int = 0
+):
+    """
+    Search for the fastest profile of one model type on the instances of one size bucket.
+
+    Args:
+        model_type (str): key of MODEL_BUILDERS.
+        instances (list): instances from load_corpus in this bucket.
+        time_matrix (DataFrame): adjacency matrix indexed and columned by locations.
+        cart_loc (dict): mapping cart_id to location.
+        method (str): "random" evaluates every sampled candidate on every instance,
+            "halving" runs successive halving over sampled candidates (doubling the
+            instance budget and keeping the faster half each round), and
+            "gurobi" evaluates the profiles suggested by Gurobi's tuning tool.
+        n_candidates (int): number of sampled profiles besides the defaults.
+        seed (int): random seed.
+
+    Returns:
+        tuple: (best_profile, report_rows)
+    """
+    rng = random.Random(seed)
+    instances = list(instances)
+    rng.shuffle(instances)
+
+    if method == "gurobi":
+        candidates = gurobi_tune_candidates(model_type, instances, time_matrix, cart_loc)
+    elif method in ("random", "halving"):
+        candidates = random_candidates(n_candidates, rng)
+    else:
+        raise ValueError(f"Unknown tuning method: {method}")
+
+    runtimes = {}
+    survivors = list(range(len(candidates)))
+    if method == "halving":
+        budget = 1
+        while len(survivors) > 1 and budget < len(instances):
+            subset = instances[:budget]
+            _solve_missing(model_type, candidates, survivors, subset, time_matrix, cart_loc, runtimes)
+            survivors = sorted(survivors, key=lambda idx: _median(runtimes, idx, subset))
+            survivors = survivors[:max(1, len(survivors) // 2)]
+            budget *= 2
+
+    # Survivors (all candidates unless halving) are evaluated on the full bucket
+    _solve_missing(model_type, candidates, survivors, instances, time_matrix, cart_loc, runtimes)
+    best_idx = min(survivors, key=lambda idx: _median(runtimes, idx, instances))
+
+    rows = []
+    for idx, profile in enumerate(candidates):
+        times = pd.Series([
+            runtimes[(idx, instance["name"])]
+            for instance in instances
+            if (idx, instance["name"]) in runtimes
+        ])
+        if times.empty:
+            continue
+        rows.append({
+            "MODEL_TYPE": model_type,
+            "PROFILE": json.dumps(profile, sort_keys=True),
+            "RUNS": len(times),
+            "MEDIAN_S": times.median(),
+            "P95_S": times.quantile(0.95),
+            "BEST": idx == best_idx,
+        })
+
+    return candidates[best_idx], rows
+
+
+def main():
+    """
+    Main workflow:
+    - Load wip_data/ plus generated instances
+    - Tune every model type per size bucket
+    - Store the best profiles (picked up by the builders in wip_even_model.py) and a report
+    Usage: python tune.py [halving|random|gurobi] [n_candidates]
+    """
+    method = sys.argv[1] if len(sys.argv) > 1 else "halving"
+    n_candidates = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    instances, time_matrix, cart_loc = load_corpus()
+
+    profiles = load_profiles()
+    report_rows = []
+    for model_type in MODEL_BUILDERS:
+        # The cart-indexed models need one cart per WIP pair
+        candidates = [
+            instance for instance in instances
+            if model_type == "set_covering" or len(instance["wip_ids"]) <= CART_CAPACITY * len(cart_loc)
+        ]
+
+        buckets = {}
+        for instance in candidates:
+            buckets.setdefault(size_bucket(len(instance["wip_ids"])), []).append(instance)
+
+        for bucket, bucket_instances in buckets.items():
+            best_profile, rows = tune_bucket(
+                model_type, bucket_instances, time_matrix, cart_loc, method, n_candidates
+            )
+            profiles.setdefault(model_type, {})[bucket] = best_profile
+            report_rows.extend({"BUCKET": bucket, **row} for row in rows)
+
+    save_profiles(profiles)
+
+    report_df = pd.DataFrame(report_rows).sort_values(by=["MODEL_TYPE", "BUCKET", "MEDIAN_S"])
+    report_path = os.path.join(OUTPUT_FOLDER, "tuning_report.csv")
+    report_df.to_csv(report_path, index=False)
+    print(report_df.to_string(index=False))
+    print(f"Saved profiles and report -> {report_path}")
+
+
+if __name__ == "__main__":
+    main()
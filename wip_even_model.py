@@ -5,12 +5,13 @@ from gurobipy import Model, GRB, quicksum
 from pprint import pprint
 
 from wip_utils import time_it, load_data, generate_output_df
+from solver_profiles import apply_solver_profile
 from preprocessing import generate_combinations
 
-@time_it
-def build_wip_even_model_1(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=10000):
+
+def construct_wip_even_model_1(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=10000):
     """
-    Build and solve WIP dispatching model (even case) using pair-based assignment with cart-route combinations.
+    Build (without solving) WIP dispatching model (even case) using pair-based assignment with cart-route combinations.
 
     Args:
         preprocess_result (dict): {(wip1, wip2): {path: ((first_wip, second_wip), (time1, time2)), ...}}
@@ -25,7 +26,7 @@ def build_wip_even_model_1(preprocess_result, wip_ids, wip_qtime, time_matrix, w
 
     Returns:
         tuple: (model, x) where
-            - model is the solved Gurobi model.
+            - model is the unsolved Gurobi model.
             - x is a dict of assignment binary variables (cart, wip1, wip2).
     """
 
@@ -89,15 +90,14 @@ def build_wip_even_model_1(preprocess_result, wip_ids, wip_qtime, time_matrix, w
 
     model.setObjective(h * total_cost + M * total_penalty, GRB.MINIMIZE)
     model.update()
-    model.optimize()
 
     return model, x
 
 
 @time_it
-def build_wip_even_model_2(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=10000):
+def build_wip_even_model_1(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=10000, params=None):
     """
-    Build and solve WIP dispatching model (even case) using scalable formulation with cart-WIP assignment and pairwise path evaluation.
+    Build and solve WIP dispatching model (even case) using pair-based assignment with cart-route combinations.
 
     Args:
         preprocess_result (dict): {(wip1, wip2): {path: ((first_wip, second_wip), (time1, time2)), ...}}
@@ -109,10 +109,41 @@ def build_wip_even_model_2(preprocess_result, wip_ids, wip_qtime, time_matrix, w
         cart_capacity (int): number of WIPs per cart (default 2).
         h (float): cost coefficient.
         M (float): penalty coefficient.
+        params (dict): Gurobi parameters overriding the stored solver profile.
 
     Returns:
         tuple: (model, x) where
             - model is the solved Gurobi model.
+            - x is a dict of assignment binary variables (cart, wip1, wip2).
+    """
+
+    model, x = construct_wip_even_model_1(
+        preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h, M
+    )
+    apply_solver_profile(model, "even_model_1", len(wip_ids), params)
+    model.optimize()
+
+    return model, x
+
+
+def construct_wip_even_model_2(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=10000):
+    """
+    Build (without solving) WIP dispatching model (even case) using scalable formulation with cart-WIP assignment and pairwise path evaluation.
+
+    Args:
+        preprocess_result (dict): {(wip1, wip2): {path: ((first_wip, second_wip), (time1, time2)), ...}}
+        wip_ids (list): list of WIP IDs.
+        wip_qtime (dict): mapping wip_id to q-time constraint.
+        time_matrix (dict): matrix of travel times.
+        wip_from (dict): mapping wip_id to from location.
+        cart_loc (dict): mapping cart_id to location.
+        cart_capacity (int): number of WIPs per cart (default 2).
+        h (float): cost coefficient.
+        M (float): penalty coefficient.
+
+    Returns:
+        tuple: (model, x) where
+            - model is the unsolved Gurobi model.
             - x is a dict of assignment binary variables (cart, wip).
     """
 
@@ -174,15 +205,45 @@ def build_wip_even_model_2(preprocess_result, wip_ids, wip_qtime, time_matrix, w
 
     model.setObjective(total_cost + total_penalty, GRB.MINIMIZE)
     model.update()
-    model.optimize()
 
     return model, x
 
 
 @time_it
-def build_set_covering_model(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=100000):
+def build_wip_even_model_2(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=10000, params=None):
     """
-    Build and solve set covering dispatch model selecting WIP pairs to cover all WIPs.
+    Build and solve WIP dispatching model (even case) using scalable formulation with cart-WIP assignment and pairwise path evaluation.
+
+    Args:
+        preprocess_result (dict): {(wip1, wip2): {path: ((first_wip, second_wip), (time1, time2)), ...}}
+        wip_ids (list): list of WIP IDs.
+        wip_qtime (dict): mapping wip_id to q-time constraint.
+        time_matrix (dict): matrix of travel times.
+        wip_from (dict): mapping wip_id to from location.
+        cart_loc (dict): mapping cart_id to location.
+        cart_capacity (int): number of WIPs per cart (default 2).
+        h (float): cost coefficient.
+        M (float): penalty coefficient.
+        params (dict): Gurobi parameters overriding the stored solver profile.
+
+    Returns:
+        tuple: (model, x) where
+            - model is the solved Gurobi model.
+            - x is a dict of assignment binary variables (cart, wip).
+    """
+
+    model, x = construct_wip_even_model_2(
+        preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h, M
+    )
+    apply_solver_profile(model, "even_model_2", len(wip_ids), params)
+    model.optimize()
+
+    return model, x
+
+
+def construct_set_covering_model(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=100000, env=None):
+    """
+    Build (without solving) set covering dispatch model selecting WIP pairs to cover all WIPs.
 
     Args:
         preprocess_result (dict): {(wip1, wip2): {path: ((first_wip, second_wip), (time1, time2)), ...}}
@@ -194,16 +255,17 @@ def build_set_covering_model(preprocess_result, wip_ids, wip_qtime, time_matrix,
         cart_capacity (int): number of WIPs per cart (default 2).
         h (float): cost coefficient.
         M (float): penalty coefficient.
+        env (Env): Gurobi environment to build the model in (default environment if None).
 
     Returns:
         tuple: (model, y, cost_s, penalty_s) where
-            - model is the solved Gurobi model.
+            - model is the unsolved Gurobi model.
             - y is a dict of selected set binary variables.
             - cost_s is dict of cost for each set.
             - penalty_s is dict of penalty for each set.
     """
 
-    model = Model("Set_Covering_Dispatch")
+    model = Model("Set_Covering_Dispatch", env=env)
 
     W = wip_ids
     S = list(preprocess_result.keys())
@@ -248,12 +310,93 @@ def build_set_covering_model(preprocess_result, wip_ids, wip_qtime, time_matrix,
 
     model.setObjective(obj, GRB.MINIMIZE)
     model.update()
-    model.optimize()
 
 
     return model, y, cost_s, penalty_s
 
 
+@time_it
+def build_set_covering_model(preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h=1, M=100000, params=None, env=None):
+    """
+    Build and solve set covering dispatch model selecting WIP pairs to cover all WIPs.
+
+    Args:
+        preprocess_result (dict): {(wip1, wip2): {path: ((first_wip, second_wip), (time1, time2)), ...}}
+        wip_ids (list): list of WIP IDs.
+        wip_qtime (dict): mapping wip_id to q-time constraint.
+        time_matrix (dict): matrix of travel times.
+        wip_from (dict): mapping wip_id to from location.
+        cart_loc (dict): mapping cart_id to location (uses first cart as reference here).
+        cart_capacity (int): number of WIPs per cart (default 2).
+        h (float): cost coefficient.
+        M (float): penalty coefficient.
+        params (dict): Gurobi parameters overriding the stored solver profile.
+        env (Env): Gurobi environment to build the model in (default environment if None).
+
+    Returns:
+        tuple: (model, y, cost_s, penalty_s) where
+            - model is the solved Gurobi model.
+            - y is a dict of selected set binary variables.
+            - cost_s is dict of cost for each set.
+            - penalty_s is dict of penalty for each set.
+    """
+
+    model, y, cost_s, penalty_s = construct_set_covering_model(
+        preprocess_result, wip_ids, wip_qtime, time_matrix, wip_from, cart_loc, cart_capacity, h, M, env
+    )
+    apply_solver_profile(model, "set_covering", len(wip_ids), params)
+    model.optimize()
+
+    return model, y, cost_s, penalty_s
+
+
+@time_it
+def build_scenario_set_covering_model(preprocess_result, wip_ids, n_carts):
+    """
+    Build (without solving) the set covering structure shared by what-if scenarios.
+
+    Objective coefficients are left at zero and the fleet constraint RHS at n_carts;
+    callers set both per scenario before optimizing.
+
+    Args:
+        preprocess_result (dict): {(wip1, wip2): {path: ((first_wip, second_wip), (time1, time2)), ...}}
+        wip_ids (list): list of WIP IDs.
+        n_carts (int): number of carts available in the base case.
+
+    Returns:
+        tuple: (model, y, fleet) where
+            - model is the unsolved Gurobi model.
+            - y is a dict of selected set binary variables.
+            - fleet is the constraint limiting the number of selected sets.
+    """
+
+    model = Model("Set_Covering_Scenarios")
+
+    W = wip_ids
+    S = list(preprocess_result.keys())
+
+    # Decision variables
+    y = model.addVars(S, vtype=GRB.BINARY, name="select_set")
+
+    # Constraints: each WIP covered exactly once
+    for w in W:
+        model.addConstr(
+            quicksum(y[s] for s in S if w in s) == 1,
+            name=f"cover_{w}"
+        )
+
+    # Constraint: one cart per selected set
+    fleet = model.addConstr(
+        quicksum(y[s] for s in S) <= n_carts,
+        name="fleet"
+    )
+
+    model.setObjective(0, GRB.MINIMIZE)
+    model.update()
+
+    return model, y, fleet
+
+
 # === Example usage ===
 if __name__ == "__main__":
 
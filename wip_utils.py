@@ -1,8 +1,11 @@
+import numpy as np
 import pandas as pd
 import functools
 import time
 from typing import Tuple, List, Dict, Any
 
+from time_matrix_cache import load_time_array
+
 
 def time_it(func):
     """Decorator to measure the execution time of a function."""
@@ -16,6 +19,26 @@ def time_it(func):
     return wrapper
 
 
+def load_time_matrix(time_matrix_path: str) -> pd.DataFrame:
+    """
+    Load the time matrix as an adjacency matrix DataFrame indexed and columned by locations.
+
+    Reads the precompiled binary form next to the CSV (rebuilt when stale), as pivoting the CSV would.
+    """
+    time_array = load_time_array(time_matrix_path)
+    loc_ids = [k for k in range(time_array.shape[0]) if (time_array[k] >= 0).any()]
+    values = time_array[np.ix_(loc_ids, loc_ids)]
+    if (values < 0).any():
+        values = np.where(values < 0, np.nan, values)
+
+    locations = [f"LOC{k}" for k in loc_ids]
+    return pd.DataFrame(
+        values,
+        index=pd.Index(locations, name='FROM'),
+        columns=pd.Index(locations, name='TO')
+    )
+
+
 @time_it
 def load_data(
     time_matrix_path: str,
@@ -26,9 +49,7 @@ def load_data(
     Load time matrix, WIP data, and cart data for model input.
     """
     # Time matrix
-    time_df = pd.read_csv(time_matrix_path)
-    locations = sorted(time_df['FROM'].unique(), key=lambda x: int(x.replace('LOC', '')))
-    time_matrix = time_df.pivot(index='FROM', columns='TO', values='XFER_TIME').reindex(index=locations, columns=locations)
+    time_matrix = load_time_matrix(time_matrix_path)
 
     # WIP data
     wip_df = pd.read_csv(wip_data_path)
@@ -155,8 +176,7 @@ def generate_output_df(
     return pd.DataFrame(rows, columns=["CART_ID", "ORDER", "WIP_ID", "ACTION", "COMPLETE_TIME"])
 
 
-@time_it
-def build_output_from_selected_sets(
+def construct_output_from_selected_sets(
     y: Dict,
     cost_s: Dict,
     penalty_s: Dict,
@@ -167,7 +187,7 @@ def build_output_from_selected_sets(
     initial_cart_loc: str
 ) -> pd.DataFrame:
     """
-    Build dispatch output DataFrame from selected feasible sets using cost_s to find optimal path.
+    Build (without timing) dispatch output DataFrame from selected feasible sets using cost_s to find optimal path.
     """
     selected_sets = [s for s in preprocess_result if y[s].X > 0.5]
 
@@ -209,3 +229,22 @@ def build_output_from_selected_sets(
             curr_loc = target_loc
 
     return pd.DataFrame(rows, columns=["CART_ID", "ORDER", "WIP_ID", "ACTION", "COMPLETE_TIME"])
+
+
+@time_it
+def build_output_from_selected_sets(
+    y: Dict,
+    cost_s: Dict,
+    penalty_s: Dict,
+    preprocess_result: Dict,
+    time_matrix: pd.DataFrame,
+    wip_from: Dict[str, str],
+    wip_to: Dict[str, str],
+    initial_cart_loc: str
+) -> pd.DataFrame:
+    """
+    Build dispatch output DataFrame from selected feasible sets using cost_s to find optimal path.
+    """
+    return construct_output_from_selected_sets(
+        y, cost_s, penalty_s, preprocess_result, time_matrix, wip_from, wip_to, initial_cart_loc
+    )